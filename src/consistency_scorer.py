@@ -8,11 +8,11 @@ For each question, calculates:
 - Per-style accuracy: which prompt style is most reliable
 """
 
-import json
 import os
+import ijson
+import orjson
 import pandas as pd
 import numpy as np
-from collections import Counter
 
 os.makedirs("results/scored", exist_ok=True)
 os.makedirs("results/summary", exist_ok=True)
@@ -20,90 +20,134 @@ os.makedirs("results/summary", exist_ok=True)
 PROMPT_STYLES = ["original", "formal", "simplified", "roleplay", "direct"]
 
 
-def consistency_score(responses: dict) -> float:
+def score_matrix(answers: np.ndarray):
     """
-    Given a dict of {style: extracted_answer},
-    returns the proportion of responses that match the majority answer.
-
-    Example:
-      {"original": "A", "formal": "B", "simplified": "B",
-       "roleplay": "B", "direct": "A"}
-      majority = "B" (3 votes), score = 3/5 = 0.6
-    """
-    answers = [v for v in responses.values() if v != "UNKNOWN"]
-    if not answers:
-        return 0.0
-    majority = Counter(answers).most_common(1)[0][0]
-    return sum(1 for a in answers if a == majority) / len(responses)
-
-
-def majority_answer(responses: dict) -> str:
-    """Returns the most common answer across all prompt styles."""
-    answers = [v for v in responses.values() if v != "UNKNOWN"]
-    if not answers:
-        return "UNKNOWN"
-    return Counter(answers).most_common(1)[0][0]
+    Vectorized consistency metrics over an (n_questions, n_styles)
+    array of extracted answers.
 
+    For each question:
+    - majority answer: most common non-UNKNOWN answer
+      ("UNKNOWN" if every style failed)
+    - consistency score: proportion of styles matching the majority
+      e.g. answers ["A", "B", "B", "B", "A"] → majority "B", score 3/5
+    - unknown rate: proportion of styles that were UNKNOWN
 
-def unknown_rate(responses: dict) -> float:
-    """Proportion of responses that were UNKNOWN."""
-    unknowns = sum(1 for v in responses.values() if v == "UNKNOWN")
-    return unknowns / len(responses)
+    Returns (majority, consistency, unknown) arrays of length n_questions.
+    """
+    n, n_styles = answers.shape
+    rows = np.arange(n)[:, None]
+
+    # map answers to small integer codes and tally votes per question
+    vocab, codes = np.unique(answers, return_inverse=True)
+    codes = codes.reshape(n, n_styles)
+    counts = np.zeros((n, len(vocab)), dtype=np.int64)
+    np.add.at(counts, (rows, codes), 1)
+
+    # earliest style index that produced each answer — ties on the vote
+    # count go to the first-seen answer in style order, matching
+    # Counter.most_common's insertion-order behaviour
+    first_seen = np.full((n, len(vocab)), n_styles, dtype=np.int64)
+    np.minimum.at(first_seen, (rows, codes),
+                  np.broadcast_to(np.arange(n_styles), (n, n_styles)))
+
+    # UNKNOWN never gets the majority vote
+    unknown_idx = np.searchsorted(vocab, "UNKNOWN")
+    if unknown_idx < len(vocab) and vocab[unknown_idx] == "UNKNOWN":
+        counts[:, unknown_idx] = 0
+        first_seen[:, unknown_idx] = n_styles
+
+    majority_votes = counts.max(axis=1)
+    # rank by (count, -first_seen): first_seen < n_styles, so scaling by
+    # n_styles keeps count order and only breaks ties
+    majority = vocab[(counts * n_styles - first_seen).argmax(axis=1)] \
+        .astype(object)
+    majority[majority_votes == 0] = "UNKNOWN"
+
+    consistency = majority_votes / n_styles
+    unknown = (answers == "UNKNOWN").mean(axis=1)
+
+    return majority, consistency, unknown
+
+
+def iter_raw_records(dataset_name: str, model_key: str):
+    """
+    Stream raw inference records one at a time instead of loading the
+    whole file. Reads the JSONL checkpoint format line by line; legacy
+    pretty-printed JSON files are streamed with ijson.
+    """
+    path = f"results/raw/{dataset_name}_{model_key}.jsonl"
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        # torn trailing line from an interrupted run
+                        continue
+        return
+
+    path = f"results/raw/{dataset_name}_{model_key}.json"
+    with open(path) as f:
+        yield from ijson.items(f, "item")
 
 
 def score_dataset(dataset_name: str, model_key: str) -> pd.DataFrame:
     """
-    Load raw inference results and compute consistency metrics
+    Stream raw inference results and compute consistency metrics
     for every question. Returns a scored DataFrame.
     """
-    input_file = f"results/raw/{dataset_name}_{model_key}.json"
-
-    with open(input_file) as f:
-        data = json.load(f)
-
-    records = []
-
-    for item in data:
+    # SoA layout: one column list per field, filled while streaming —
+    # no per-row record dicts for pandas to re-collect into columns
+    ids, questions, corrects = [], [], []
+    ans_cols = {s: [] for s in PROMPT_STYLES}
+
+    for item in iter_raw_records(dataset_name, model_key):
+        ids.append(item["id"])
+        questions.append(item["question"][:80])
+        corrects.append(item["correct_answer"].strip().upper())
         # extract just the answer letter/word per style
-        responses = {
-            style: item["responses"][style]["extracted"]
-            for style in PROMPT_STYLES
-            if style in item["responses"]
-        }
-
-        maj = majority_answer(responses)
-        cons_score = consistency_score(responses)
-        unk_rate = unknown_rate(responses)
-        correct = item["correct_answer"].strip().upper()
-
-        # is the majority answer correct?
-        is_accurate = (maj.upper() == correct)
-
-        record = {
-            "id": item["id"],
-            "question": item["question"][:80],
-            "correct_answer": correct,
-            "majority_answer": maj,
-            "is_accurate": is_accurate,
-            "consistency_score": round(cons_score, 3),
-            "unknown_rate": round(unk_rate, 3),
-            "dataset": dataset_name,
-            "model": model_key,
-        }
-
-        # add per-style answers and correctness
-        for style in PROMPT_STYLES:
-            ans = responses.get(style, "UNKNOWN")
-            record[f"ans_{style}"] = ans
-            record[f"correct_{style}"] = (ans.upper() == correct)
-
-        records.append(record)
-
-    df = pd.DataFrame(records)
-
-    # save scored results
+        responses = item["responses"]
+        for s in PROMPT_STYLES:
+            ans_cols[s].append(
+                responses.get(s, {}).get("extracted", "UNKNOWN"))
+
+    ans_arrs = {s: np.asarray(ans_cols[s], dtype=str)
+                for s in PROMPT_STYLES}
+    answers = np.stack([ans_arrs[s] for s in PROMPT_STYLES],
+                       axis=1).astype(object)
+    correct = np.asarray(corrects, dtype=str)
+
+    # one vectorized pass instead of per-question Counter loops
+    majority, cons_scores, unk_rates = score_matrix(answers)
+
+    # is the majority answer correct?
+    is_accurate = np.char.upper(majority.astype(str)) == correct
+
+    df = pd.DataFrame({
+        "id": ids,
+        "question": questions,
+        "correct_answer": correct,
+        "majority_answer": majority,
+        "is_accurate": is_accurate,
+        "consistency_score": np.round(cons_scores, 3),
+        "unknown_rate": np.round(unk_rates, 3),
+        "dataset": dataset_name,
+        "model": model_key,
+        # per-style answers and correctness
+        **{f"ans_{s}": ans_arrs[s] for s in PROMPT_STYLES},
+        **{f"correct_{s}": np.char.upper(ans_arrs[s]) == correct
+           for s in PROMPT_STYLES},
+    })
+
+    # save scored results — parquet for fast downstream reads,
+    # CSV kept for hand-inspection
     out_file = f"results/scored/{dataset_name}_{model_key}.csv"
-    df.to_csv(out_file, index=False)
+    # values are pre-rounded to 3 decimals — full-precision float repr
+    # and platform line endings just bloat the file
+    df.to_csv(out_file, index=False, float_format="%.3f",
+              lineterminator="\n")
+    df.to_parquet(out_file.replace(".csv", ".parquet"))
     print(f"  Saved scored results to {out_file}")
 
     return df
@@ -142,27 +186,34 @@ if __name__ == "__main__":
     models = ["phi3_mini","llama3.2","gemma2","mistral","meditron"]
 
     all_summaries = []
+    report = []   # buffer the per-dataset report — one write at the end
 
     for model_key in models:
-        print(f"\n=== Scoring {model_key} ===")
+        report.append(f"\n=== Scoring {model_key} ===")
         for dataset_name in datasets:
-            print(f"\n  Dataset: {dataset_name}")
+            report.append(f"\n  Dataset: {dataset_name}")
             df = score_dataset(dataset_name, model_key)
             summary = summarize(df, dataset_name, model_key)
             all_summaries.append(summary)
 
-            # print key metrics immediately
-            print(f"    Mean Consistency:     {summary['mean_consistency']}")
-            print(f"    Fully Consistent:     {summary['fully_consistent_pct']}%")
-            print(f"    Overall Accuracy:     {summary['overall_accuracy']}%")
-            print(f"    Unknown Rate:         {summary['unknown_rate']}%")
-            print(f"    Accuracy by style:")
+            report.append(
+                f"    Mean Consistency:     {summary['mean_consistency']}")
+            report.append(
+                f"    Fully Consistent:     {summary['fully_consistent_pct']}%")
+            report.append(
+                f"    Overall Accuracy:     {summary['overall_accuracy']}%")
+            report.append(
+                f"    Unknown Rate:         {summary['unknown_rate']}%")
+            report.append("    Accuracy by style:")
             for s in PROMPT_STYLES:
-                print(f"      {s:12}: {summary[f'acc_{s}']}%")
+                report.append(f"      {s:12}: {summary[f'acc_{s}']}%")
+
+    print("\n".join(report))
 
     # save master summary
     summary_df = pd.DataFrame(all_summaries)
-    summary_df.to_csv("results/summary/master_summary.csv", index=False)
+    summary_df.to_csv("results/summary/master_summary.csv", index=False,
+                      lineterminator="\n")
     print("\n✅ Master summary saved to results/summary/master_summary.csv")
     print("\n=== MASTER SUMMARY ===")
     print(summary_df.to_string(index=False))
\ No newline at end of file
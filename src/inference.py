@@ -3,19 +3,33 @@ Inference Engine for Clinical LLM Consistency Study.
 
 For each question, runs all 5 prompt variations through the model
 and collects answers. Saves results for consistency scoring.
+
+Requests are issued asynchronously against the local Ollama server,
+with concurrency capped by a semaphore. Set OLLAMA_NUM_PARALLEL=8 in
+the server environment so Ollama actually serves the in-flight
+requests concurrently instead of queueing them.
 """
 
-import json
+import asyncio
+import hashlib
 import os
-import time
 import re
-import requests
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import aiohttp
+import orjson
 import pandas as pd
 from tqdm import tqdm
 
 os.makedirs("results/raw", exist_ok=True)
 
 OLLAMA_URL = "http://localhost:11434/api/generate"
+CACHE_FILE = "results/response_cache.db"
+
+MAX_CONCURRENT = 8   # total in flight — keep in sync with OLLAMA_NUM_PARALLEL
+SWEEP_WORKERS = 2    # concurrent (model, dataset) sweeps in __main__
+BATCH_SIZE = 16      # questions whose 5 prompts are in flight together
 
 MODELS = {
     "phi3_mini": "phi3:mini",
@@ -25,107 +39,240 @@ MODELS = {
     "meditron": "meditron:latest"
 }
 
-def query_ollama(model: str, prompt: str, timeout: int = 60) -> str:
-    """Send a prompt to Ollama and return the response text."""
+# ── Response cache ──────────────────────────────────────────────────────────
+# Identical (model, prompt) pairs recur across re-runs and across datasets
+# that share template wording. Cache raw responses in SQLite so a hit
+# replaces a multi-second LLM call with a local lookup.
+
+_cache_conn = None
+_cache_lock = threading.Lock()
+
+def _get_cache() -> sqlite3.Connection:
+    global _cache_conn
+    if _cache_conn is None:
+        # shared across the sweep worker threads — guarded by _cache_lock
+        _cache_conn = sqlite3.connect(CACHE_FILE, check_same_thread=False)
+        _cache_conn.execute("PRAGMA journal_mode=WAL")
+        _cache_conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, response TEXT)")
+    return _cache_conn
+
+
+def _cache_key(model: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model}\0{prompt}".encode()).hexdigest()
+
+
+def cache_get(model: str, prompt: str) -> str | None:
+    with _cache_lock:
+        row = _get_cache().execute(
+            "SELECT response FROM cache WHERE key=?",
+            (_cache_key(model, prompt),)).fetchone()
+    return row[0] if row else None
+
+
+def cache_put(model: str, prompt: str, response: str):
+    with _cache_lock:
+        conn = _get_cache()
+        conn.execute("INSERT OR IGNORE INTO cache VALUES (?, ?)",
+                     (_cache_key(model, prompt), response))
+        conn.commit()
+
+
+async def aquery_ollama(session: aiohttp.ClientSession, model: str,
+                        prompt: str, num_ctx: int = 1024,
+                        timeout: int = 60) -> str:
+    """
+    Send a prompt to Ollama and return the response text.
+
+    keep_alive pins the model in memory across calls (no cold reload
+    per request), and num_ctx is kept as small as each dataset allows —
+    a smaller KV-cache means less memory traffic per token on this
+    memory-bandwidth-bound workload.
+    """
     payload = {
         "model": model,
         "prompt": prompt,
         "stream": False,
+        "keep_alive": "30m",       # avoid model reload between calls
         "options": {
             "temperature": 0,      # deterministic — important for research
             "num_predict": 10,     # we only need a letter or yes/no/maybe
+            "num_ctx": num_ctx,    # 1024 for MCQ, 2048 for PubMedQA
+            "num_batch": 512,
         }
     }
     try:
-        r = requests.post(OLLAMA_URL, json=payload, timeout=timeout)
-        r.raise_for_status()
-        return r.json().get("response", "").strip()
+        async with session.post(
+                OLLAMA_URL, json=payload,
+                timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+            r.raise_for_status()
+            data = await r.json()
+            return data.get("response", "").strip()
     except Exception as e:
         return f"ERROR: {e}"
 
 
+# compiled once at import — these run for every (question, style) response;
+# case-insensitive so we never allocate an upper/lowercased copy of raw
+_MCQ_RE = re.compile(r'\b([ABCD])\b', re.IGNORECASE)
+_PUBMEDQA_RE = re.compile(r'\b(yes|no|maybe)\b', re.IGNORECASE)
+
+
 def extract_answer_mcq(raw: str) -> str:
     """
     Extract A/B/C/D from model response.
     Handles cases like 'A', 'A.', 'The answer is A', 'Option A', etc.
     """
-    raw = raw.upper().strip()
     # look for standalone A B C or D
-    match = re.search(r'\b([ABCD])\b', raw)
+    match = _MCQ_RE.search(raw)
     if match:
-        return match.group(1)
+        return match.group(1).upper()
     # fallback — first character if it's a letter
-    if raw and raw[0] in "ABCD":
-        return raw[0]
+    first = raw.strip()[:1].upper()
+    if first in ("A", "B", "C", "D"):
+        return first
     return "UNKNOWN"
 
 
 def extract_answer_pubmedqa(raw: str) -> str:
     """
-    Extract yes/no/maybe from model response.
+    Extract yes/no/maybe from model response — one scan, on word
+    boundaries so e.g. 'not' or 'unknown' no longer match as 'no'.
     """
-    raw = raw.lower().strip()
-    if "yes" in raw:
-        return "yes"
-    if "no" in raw:
-        return "no"
-    if "maybe" in raw:
-        return "maybe"
-    return "UNKNOWN"
+    match = _PUBMEDQA_RE.search(raw)
+    return match.group(1).lower() if match else "UNKNOWN"
+
+
+def load_done_ids(output_file: str) -> set:
+    """
+    Read an existing JSONL checkpoint and return the completed ids.
+
+    A run killed mid-write can leave a torn final line; drop it and
+    truncate the file back to the last complete record so the next
+    append doesn't fuse the fragment with a new record.
+    """
+    if not os.path.exists(output_file):
+        return set()
+    done = set()
+    good_end = 0
+    with open(output_file, "rb") as f:
+        for line in f:
+            if line.strip():
+                try:
+                    done.add(orjson.loads(line)["id"])
+                except orjson.JSONDecodeError:
+                    break
+            good_end += len(line)
+    if good_end < os.path.getsize(output_file):
+        with open(output_file, "r+b") as f:
+            f.truncate(good_end)
+        print(f"  Dropped torn trailing record in {output_file}")
+    return done
+
+
+async def _run_inference_async(data: list, model_name: str,
+                               is_pubmedqa: bool, out_f,
+                               max_concurrent: int = MAX_CONCURRENT) -> int:
+    """
+    Fire all 5 prompt variations per question concurrently, a batch of
+    questions at a time, bounded by `max_concurrent` in-flight requests.
+    Each completed record is appended to `out_f` immediately, so an
+    interrupted run only loses the batch in flight.
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+    # PubMedQA carries ~1000 chars of abstract context; MCQ fits in 1024
+    num_ctx = 2048 if is_pubmedqa else 1024
+
+    async def bounded_query(session, prompt):
+        cached = cache_get(model_name, prompt)
+        if cached is not None:
+            return cached
+        async with semaphore:
+            raw = await aquery_ollama(session, model_name, prompt,
+                                      num_ctx=num_ctx)
+        if not raw.startswith("ERROR:"):
+            cache_put(model_name, prompt, raw)
+        return raw
+
+    n_done = 0
+
+    async with aiohttp.ClientSession() as session:
+        for start in tqdm(range(0, len(data), BATCH_SIZE)):
+            batch = data[start:start + BATCH_SIZE]
+
+            # styles are issued in their fixed insertion order so the 5
+            # calls sharing a context prefix hit Ollama's warm KV-cache
+            coros = [bounded_query(session, prompt)
+                     for item in batch
+                     for prompt in item["prompts"].values()]
+            raws = await asyncio.gather(*coros)
+
+            pos = 0
+            for item in batch:
+                record = {
+                    "id": item["id"],
+                    "question": item["question"],
+                    "correct_answer": item["correct_answer"],
+                    "responses": {}
+                }
+                for style in item["prompts"]:
+                    raw = raws[pos]
+                    pos += 1
+                    if is_pubmedqa:
+                        answer = extract_answer_pubmedqa(raw)
+                    else:
+                        answer = extract_answer_mcq(raw)
+                    record["responses"][style] = {
+                        "raw": raw,
+                        "extracted": answer
+                    }
+                out_f.write(orjson.dumps(record) + b"\n")
+                out_f.flush()
+                n_done += 1
+
+    return n_done
 
 
 def run_inference(dataset_name: str, model_key: str, model_name: str,
-                  max_samples: int = None):
+                  max_samples: int = None,
+                  max_concurrent: int = MAX_CONCURRENT):
     """
     Run all 5 prompt variations for each question through the model.
-    Saves results to results/raw/{dataset}_{model}.json
+    Appends results to results/raw/{dataset}_{model}.jsonl, one record
+    per line, and resumes from the checkpoint if the file already has
+    completed questions.
     """
     prompt_file = f"data/prompts/{dataset_name}_prompts.json"
-    output_file = f"results/raw/{dataset_name}_{model_key}.json"
-
-    # skip if already done
-    if os.path.exists(output_file):
-        print(f"  Already exists: {output_file} — skipping")
-        return
+    output_file = f"results/raw/{dataset_name}_{model_key}.jsonl"
 
-    with open(prompt_file) as f:
-        data = json.load(f)
+    with open(prompt_file, "rb") as f:
+        data = orjson.loads(f.read())
 
     if max_samples:
         data = data[:max_samples]
 
-    is_pubmedqa = dataset_name == "pubmedqa"
-    results = []
-
-    print(f"\nRunning {model_key} on {dataset_name} ({len(data)} questions)...")
+    # resume: skip questions already checkpointed
+    done_ids = load_done_ids(output_file)
+    if done_ids:
+        data = [item for item in data if item["id"] not in done_ids]
+        print(f"  Resuming {output_file}: {len(done_ids)} done, "
+              f"{len(data)} remaining")
 
-    for item in tqdm(data):
-        record = {
-            "id": item["id"],
-            "question": item["question"],
-            "correct_answer": item["correct_answer"],
-            "responses": {}
-        }
-
-        for style, prompt in item["prompts"].items():
-            raw = query_ollama(model_name, prompt)
-            if is_pubmedqa:
-                answer = extract_answer_pubmedqa(raw)
-            else:
-                answer = extract_answer_mcq(raw)
+    if not data:
+        print(f"  Already complete: {output_file} — skipping")
+        return
 
-            record["responses"][style] = {
-                "raw": raw,
-                "extracted": answer
-            }
-            time.sleep(0.1)  # small pause to avoid overwhelming Ollama
+    is_pubmedqa = dataset_name == "pubmedqa"
 
-        results.append(record)
+    print(f"\nRunning {model_key} on {dataset_name} ({len(data)} questions)...")
 
-    with open(output_file, "w") as f:
-        json.dump(results, f, indent=2)
+    with open(output_file, "ab") as out_f:
+        n_done = asyncio.run(
+            _run_inference_async(data, model_name, is_pubmedqa, out_f,
+                                 max_concurrent=max_concurrent))
 
-    print(f"  ✅ Saved {len(results)} results to {output_file}")
+    print(f"  ✅ Saved {n_done} results to {output_file}")
 
 
 if __name__ == "__main__":
@@ -141,14 +288,23 @@ if __name__ == "__main__":
     #         # max_samples=10      # ← test run first, change to None for full run
     #         max_samples=None      # ← full run
     #     )
-        
-    for model_key, model_name in MODELS.items():
-        for dataset in ["medqa", "medmcqa", "pubmedqa"]:
-            run_inference(
-                dataset_name=dataset,
-                model_key=model_key,
-                model_name=model_name,
-                max_samples=None
-            )
-
-    print("\n✅ Test inference complete. Check results/raw/ for output.")
\ No newline at end of file
+
+    # Two (model, dataset) sweeps in flight: while one model is being
+    # loaded/swapped by Ollama, the other keeps the server busy. Set
+    # OLLAMA_MAX_LOADED_MODELS=2 on the server so both stay resident.
+    # Each sweep gets an even share of MAX_CONCURRENT so the total
+    # in-flight requests never exceed what the server is provisioned for.
+    tasks = [(model_key, model_name, dataset)
+             for model_key, model_name in MODELS.items()
+             for dataset in ["medqa", "medmcqa", "pubmedqa"]]
+
+    with ThreadPoolExecutor(max_workers=SWEEP_WORKERS) as executor:
+        futures = [
+            executor.submit(run_inference, dataset, model_key, model_name,
+                            max_concurrent=MAX_CONCURRENT // SWEEP_WORKERS)
+            for model_key, model_name, dataset in tasks
+        ]
+        for future in futures:
+            future.result()
+
+    print("\n✅ Test inference complete. Check results/raw/ for output.")
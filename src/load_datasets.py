@@ -54,9 +54,15 @@ if __name__ == "__main__":
     medmcqa_df = load_medmcqa()
     pubmedqa_df = load_pubmedqa()
 
+    # parquet preserves dict columns (options/context) natively, so
+    # prompt building can skip re-parsing repr strings; CSV kept for
+    # hand-inspection
     medqa_df.to_csv("data/processed/medqa_sample.csv", index=False)
+    medqa_df.to_parquet("data/processed/medqa_sample.parquet")
     medmcqa_df.to_csv("data/processed/medmcqa_sample.csv", index=False)
+    medmcqa_df.to_parquet("data/processed/medmcqa_sample.parquet")
     pubmedqa_df.to_csv("data/processed/pubmedqa_sample.csv", index=False)
+    pubmedqa_df.to_parquet("data/processed/pubmedqa_sample.parquet")
 
     print("All datasets loaded and saved to data/processed/")
     print(f"  MedQA:     {len(medqa_df)} samples")
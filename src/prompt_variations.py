@@ -12,126 +12,194 @@ This tests whether small LLMs give CONSISTENT answers regardless
 of how the question is asked — a key clinical safety requirement.
 """
 
+import ast
 import pandas as pd
 import json
 import os
+from functools import lru_cache
 
 os.makedirs("data/prompts", exist_ok=True)
 
 
 # ── MedQA prompt templates ──────────────────────────────────────────────────
+# Templates are built once at module scope and filled per question with
+# .format — the wording never changes, only {q}/{o}/{a}..{d} do.
+
+_MEDQA_TEMPLATES = {
+
+    "original": (
+        "Answer the following medical question by choosing the correct option.\n\n"
+        "Question: {q}\n\n"
+        "Options:\n{o}\n\n"
+        "Answer with only the option letter (A, B, C, or D)."
+    ),
+
+    "formal": (
+        "You are a medical expert. Based on your clinical knowledge, "
+        "select the most appropriate answer to the following question.\n\n"
+        "Clinical Question: {q}\n\n"
+        "Choices:\n{o}\n\n"
+        "Respond with only the letter of the correct choice (A, B, C, or D)."
+    ),
+
+    "simplified": (
+        "Read this medical question carefully and pick the best answer.\n\n"
+        "{q}\n\n"
+        "{o}\n\n"
+        "Which letter is correct? Reply with just A, B, C, or D."
+    ),
+
+    "roleplay": (
+        "You are a physician taking a medical licensing exam. "
+        "Answer this question as you would on the exam.\n\n"
+        "Q: {q}\n\n"
+        "{o}\n\n"
+        "Your answer (A, B, C, or D):"
+    ),
+
+    "direct": (
+        "Medical question: {q}\n\n"
+        "Option A: {a}\n"
+        "Option B: {b}\n"
+        "Option C: {c}\n"
+        "Option D: {d}\n\n"
+        "What is the correct option? State only the letter."
+    ),
+}
+
+
+@lru_cache(maxsize=None)
+def _medqa_prompts_cached(question: str, opts_tuple: tuple) -> dict:
+    options = dict(opts_tuple)
+    # Format options as a clean string — built once, shared by all styles
+    opts = "\n".join([f"{k}: {v}" for k, v in options.items()])
+
+    return {
+        style: template.format(
+            q=question, o=opts,
+            a=options.get("A", ""), b=options.get("B", ""),
+            c=options.get("C", ""), d=options.get("D", ""))
+        for style, template in _MEDQA_TEMPLATES.items()
+    }
+
 
 def make_medqa_prompts(question: str, options: dict) -> dict:
     """
     Generate 5 prompt variations for a MedQA (USMLE) question.
     Options is a dict like {"A": "...", "B": "...", "C": "...", "D": "..."}
-    """
-    # Format options as a clean string
-    opts = "\n".join([f"{k}: {v}" for k, v in options.items()])
 
-    prompts = {
-
-        "original": (
-            f"Answer the following medical question by choosing the correct option.\n\n"
-            f"Question: {question}\n\n"
-            f"Options:\n{opts}\n\n"
-            f"Answer with only the option letter (A, B, C, or D)."
-        ),
-
-        "formal": (
-            f"You are a medical expert. Based on your clinical knowledge, "
-            f"select the most appropriate answer to the following question.\n\n"
-            f"Clinical Question: {question}\n\n"
-            f"Choices:\n{opts}\n\n"
-            f"Respond with only the letter of the correct choice (A, B, C, or D)."
-        ),
-
-        "simplified": (
-            f"Read this medical question carefully and pick the best answer.\n\n"
-            f"{question}\n\n"
-            f"{opts}\n\n"
-            f"Which letter is correct? Reply with just A, B, C, or D."
-        ),
-
-        "roleplay": (
-            f"You are a physician taking a medical licensing exam. "
-            f"Answer this question as you would on the exam.\n\n"
-            f"Q: {question}\n\n"
-            f"{opts}\n\n"
-            f"Your answer (A, B, C, or D):"
-        ),
-
-        "direct": (
-            f"Medical question: {question}\n\n"
-            f"Option A: {options.get('A', '')}\n"
-            f"Option B: {options.get('B', '')}\n"
-            f"Option C: {options.get('C', '')}\n"
-            f"Option D: {options.get('D', '')}\n\n"
-            f"What is the correct option? State only the letter."
-        ),
-    }
-    return prompts
+    Memoized: re-running the build over overlapping samples reuses the
+    prompts generated for a (question, options) pair.
+    """
+    return _medqa_prompts_cached(question, tuple(sorted(options.items())))
 
 
 # ── MedMCQA prompt templates ────────────────────────────────────────────────
 
+_MEDMCQA_TEMPLATES = {
+
+    "original": (
+        "Answer the following medical question by choosing the correct option.\n\n"
+        "Question: {q}\n\n"
+        "Options:\n{o}\n\n"
+        "Answer with only the option letter (A, B, C, or D)."
+    ),
+
+    "formal": (
+        "You are a medical expert. Select the most appropriate answer "
+        "to the following clinical question.\n\n"
+        "Question: {q}\n\n"
+        "Choices:\n{o}\n\n"
+        "Respond with only the letter of the correct choice (A, B, C, or D)."
+    ),
+
+    "simplified": (
+        "Read this question and pick the best answer.\n\n"
+        "{q}\n\n"
+        "{o}\n\n"
+        "Which letter is correct? Reply with just A, B, C, or D."
+    ),
+
+    "roleplay": (
+        "You are a doctor taking a medical entrance exam. "
+        "Answer this question as you would on the exam.\n\n"
+        "Q: {q}\n\n"
+        "{o}\n\n"
+        "Your answer (A, B, C, or D):"
+    ),
+
+    "direct": (
+        "Medical question: {q}\n\n"
+        "Option A: {a}\n"
+        "Option B: {b}\n"
+        "Option C: {c}\n"
+        "Option D: {d}\n\n"
+        "What is the correct option? State only the letter."
+    ),
+}
+
+
+@lru_cache(maxsize=None)
 def make_medmcqa_prompts(question: str, opa: str, opb: str,
                           opc: str, opd: str) -> dict:
     """
     Generate 5 prompt variations for a MedMCQA question.
+    Memoized — all arguments are plain strings.
     """
     opts = f"A: {opa}\nB: {opb}\nC: {opc}\nD: {opd}"
 
-    prompts = {
-
-        "original": (
-            f"Answer the following medical question by choosing the correct option.\n\n"
-            f"Question: {question}\n\n"
-            f"Options:\n{opts}\n\n"
-            f"Answer with only the option letter (A, B, C, or D)."
-        ),
-
-        "formal": (
-            f"You are a medical expert. Select the most appropriate answer "
-            f"to the following clinical question.\n\n"
-            f"Question: {question}\n\n"
-            f"Choices:\n{opts}\n\n"
-            f"Respond with only the letter of the correct choice (A, B, C, or D)."
-        ),
-
-        "simplified": (
-            f"Read this question and pick the best answer.\n\n"
-            f"{question}\n\n"
-            f"{opts}\n\n"
-            f"Which letter is correct? Reply with just A, B, C, or D."
-        ),
-
-        "roleplay": (
-            f"You are a doctor taking a medical entrance exam. "
-            f"Answer this question as you would on the exam.\n\n"
-            f"Q: {question}\n\n"
-            f"{opts}\n\n"
-            f"Your answer (A, B, C, or D):"
-        ),
-
-        "direct": (
-            f"Medical question: {question}\n\n"
-            f"Option A: {opa}\n"
-            f"Option B: {opb}\n"
-            f"Option C: {opc}\n"
-            f"Option D: {opd}\n\n"
-            f"What is the correct option? State only the letter."
-        ),
+    return {
+        style: template.format(q=question, o=opts,
+                               a=opa, b=opb, c=opc, d=opd)
+        for style, template in _MEDMCQA_TEMPLATES.items()
     }
-    return prompts
 
 
 # ── PubMedQA prompt templates ───────────────────────────────────────────────
+# Only the style-specific suffixes live here; the shared context prefix
+# is built per question in make_pubmedqa_prompts.
+
+_PUBMEDQA_SUFFIXES = {
+
+    "original": (
+        "Based on the research context above, answer the question.\n"
+        "Answer with only: yes, no, or maybe."
+    ),
+
+    "formal": (
+        "You are a biomedical researcher. Based on the abstract above, "
+        "determine whether the answer to the question is yes, no, or "
+        "maybe.\n"
+        "Respond with only: yes, no, or maybe."
+    ),
+
+    "simplified": (
+        "Read the text above and answer the question.\n"
+        "Reply with only: yes, no, or maybe."
+    ),
+
+    "roleplay": (
+        "You are a doctor reviewing this research paper. Based on the "
+        "excerpt above, answer the clinical question.\n"
+        "Your answer (yes, no, or maybe):"
+    ),
+
+    "direct": (
+        "A (yes/no/maybe):"
+    ),
+}
+
 
 def make_pubmedqa_prompts(question: str, context: str) -> dict:
     """
     Generate 5 prompt variations for a PubMedQA question.
     Answer is yes / no / maybe.
+
+    All 5 variations start with the identical context + question block
+    and put the style-specific instruction last. Ollama's KV-cache can
+    then reuse the prefill of the long shared prefix across the 5 calls
+    for one question (set OLLAMA_KEEP_ALIVE=30m on the server so the
+    cache stays warm between calls).
     """
     # context is a dict with key 'contexts' (list of strings)
     if isinstance(context, dict):
@@ -139,75 +207,83 @@ def make_pubmedqa_prompts(question: str, context: str) -> dict:
     else:
         ctx_text = str(context)[:1000]
 
-    prompts = {
-
-        "original": (
-            f"Based on the following research context, answer the question "
-            f"with yes, no, or maybe.\n\n"
-            f"Context: {ctx_text}\n\n"
-            f"Question: {question}\n\n"
-            f"Answer with only: yes, no, or maybe."
-        ),
-
-        "formal": (
-            f"You are a biomedical researcher. Based on the provided abstract, "
-            f"determine whether the answer to the question is yes, no, or maybe.\n\n"
-            f"Abstract: {ctx_text}\n\n"
-            f"Research Question: {question}\n\n"
-            f"Respond with only: yes, no, or maybe."
-        ),
-
-        "simplified": (
-            f"Read the text below and answer the question.\n\n"
-            f"Text: {ctx_text}\n\n"
-            f"Question: {question}\n\n"
-            f"Reply with only: yes, no, or maybe."
-        ),
-
-        "roleplay": (
-            f"You are a doctor reviewing a research paper. "
-            f"Based on this excerpt, answer the clinical question.\n\n"
-            f"Excerpt: {ctx_text}\n\n"
-            f"Question: {question}\n\n"
-            f"Your answer (yes, no, or maybe):"
-        ),
-
-        "direct": (
-            f"Context: {ctx_text}\n\n"
-            f"Q: {question}\n"
-            f"A (yes/no/maybe):"
-        ),
-    }
-    return prompts
+    return _pubmedqa_prompts_cached(question, ctx_text)
+
+
+@lru_cache(maxsize=None)
+def _pubmedqa_prompts_cached(question: str, ctx_text: str) -> dict:
+    # shared prefix — identical tokens across all 5 styles
+    prefix = f"Context: {ctx_text}\n\nQuestion: {question}\n\n"
+
+    return {style: prefix + suffix
+            for style, suffix in _PUBMEDQA_SUFFIXES.items()}
 
 
 # ── Build full prompt dataset ───────────────────────────────────────────────
 
+def _load_processed(name: str) -> pd.DataFrame:
+    """
+    Load a processed sample, preferring parquet (dict columns like
+    options/context round-trip natively) over the CSV fallback, where
+    dicts were flattened to repr strings.
+    """
+    parquet_file = f"data/processed/{name}_sample.parquet"
+    if os.path.exists(parquet_file):
+        return pd.read_parquet(parquet_file)
+    return pd.read_csv(f"data/processed/{name}_sample.csv")
+
+
+def _parse_options(raw) -> dict:
+    """
+    Parse the options column back to a dict. Parquet input arrives as a
+    dict already; CSV input is a Python repr string — ast.literal_eval
+    handles apostrophes inside option text, which the old
+    replace("'", '"') + json.loads approach mangled.
+    """
+    if isinstance(raw, dict):
+        return raw
+    try:
+        return ast.literal_eval(raw)
+    except Exception:
+        return {"A": "", "B": "", "C": "", "D": ""}
+
+
+def _parse_context(raw) -> dict:
+    """Parse the context column back to a dict (see _parse_options)."""
+    if isinstance(raw, dict):
+        return raw
+    try:
+        return ast.literal_eval(raw)
+    except Exception:
+        return {"contexts": [str(raw)]}
+
+
 def build_prompt_dataset():
     """
-    Load processed CSVs and generate all prompt variations.
+    Load processed samples and generate all prompt variations.
     Saves a JSON file for each dataset.
+
+    Rows are read by zipping column arrays rather than df.iterrows(),
+    which boxes every row into a Series and dominates runtime once
+    n_samples is scaled up.
     """
 
     # ── MedQA ──
     print("Building MedQA prompts...")
-    medqa_df = pd.read_csv("data/processed/medqa_sample.csv")
-    medqa_prompts = []
-
-    for idx, row in medqa_df.iterrows():
-        # options column is a string repr of dict — parse it
-        try:
-            options = json.loads(row["options"].replace("'", '"'))
-        except Exception:
-            options = {"A": "", "B": "", "C": "", "D": ""}
-
-        entry = {
-            "id": idx,
-            "question": row["question"],
-            "correct_answer": row["answer_idx"],
-            "prompts": make_medqa_prompts(row["question"], options)
+    medqa_df = _load_processed("medqa")
+
+    medqa_prompts = [
+        {
+            "id": i,
+            "question": q,
+            "correct_answer": a,
+            "prompts": make_medqa_prompts(q, _parse_options(o))
         }
-        medqa_prompts.append(entry)
+        for i, (q, o, a) in enumerate(zip(
+            medqa_df["question"].to_numpy(),
+            medqa_df["options"].to_numpy(),
+            medqa_df["answer_idx"].to_numpy()))
+    ]
 
     with open("data/prompts/medqa_prompts.json", "w") as f:
         json.dump(medqa_prompts, f, indent=2)
@@ -215,25 +291,31 @@ def build_prompt_dataset():
 
     # ── MedMCQA ──
     print("Building MedMCQA prompts...")
-    medmcqa_df = pd.read_csv("data/processed/medmcqa_sample.csv")
+    medmcqa_df = _load_processed("medmcqa")
 
     # Map numeric correct option to letter
     cop_map = {0: "A", 1: "B", 2: "C", 3: "D"}
-    medmcqa_prompts = []
-
-    for idx, row in medmcqa_df.iterrows():
-        entry = {
-            "id": idx,
-            "question": row["question"],
-            "correct_answer": cop_map.get(int(row["cop"]), "A"),
-            "subject": row.get("subject_name", ""),
+    if "subject_name" not in medmcqa_df.columns:
+        medmcqa_df["subject_name"] = ""
+
+    medmcqa_prompts = [
+        {
+            "id": i,
+            "question": q,
+            "correct_answer": cop_map.get(int(cop), "A"),
+            "subject": subj,
             "prompts": make_medmcqa_prompts(
-                row["question"],
-                str(row["opa"]), str(row["opb"]),
-                str(row["opc"]), str(row["opd"])
-            )
+                q, str(opa), str(opb), str(opc), str(opd))
         }
-        medmcqa_prompts.append(entry)
+        for i, (q, cop, subj, opa, opb, opc, opd) in enumerate(zip(
+            medmcqa_df["question"].to_numpy(),
+            medmcqa_df["cop"].to_numpy(),
+            medmcqa_df["subject_name"].to_numpy(),
+            medmcqa_df["opa"].to_numpy(),
+            medmcqa_df["opb"].to_numpy(),
+            medmcqa_df["opc"].to_numpy(),
+            medmcqa_df["opd"].to_numpy()))
+    ]
 
     with open("data/prompts/medmcqa_prompts.json", "w") as f:
         json.dump(medmcqa_prompts, f, indent=2)
@@ -241,23 +323,20 @@ def build_prompt_dataset():
 
     # ── PubMedQA ──
     print("Building PubMedQA prompts...")
-    pubmedqa_df = pd.read_csv("data/processed/pubmedqa_sample.csv")
-    pubmedqa_prompts = []
-
-    for idx, row in pubmedqa_df.iterrows():
-        # context was saved as string — parse it back
-        try:
-            context = json.loads(row["context"].replace("'", '"'))
-        except Exception:
-            context = {"contexts": [str(row["context"])]}
-
-        entry = {
-            "id": idx,
-            "question": row["question"],
-            "correct_answer": row["final_decision"],
-            "prompts": make_pubmedqa_prompts(row["question"], context)
+    pubmedqa_df = _load_processed("pubmedqa")
+
+    pubmedqa_prompts = [
+        {
+            "id": i,
+            "question": q,
+            "correct_answer": a,
+            "prompts": make_pubmedqa_prompts(q, _parse_context(ctx))
         }
-        pubmedqa_prompts.append(entry)
+        for i, (q, ctx, a) in enumerate(zip(
+            pubmedqa_df["question"].to_numpy(),
+            pubmedqa_df["context"].to_numpy(),
+            pubmedqa_df["final_decision"].to_numpy()))
+    ]
 
     with open("data/prompts/pubmedqa_prompts.json", "w") as f:
         json.dump(pubmedqa_prompts, f, indent=2)
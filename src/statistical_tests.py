@@ -14,6 +14,10 @@ MODELS = ["phi3_mini", "llama3.2", "gemma2", "mistral","meditron"]
 DATASETS = ["medqa", "medmcqa", "pubmedqa"]
 
 def load_scored(dataset, model):
+    # parquet (written by the scorer) reads far faster than CSV
+    parquet_file = f"results/scored/{dataset}_{model}.parquet"
+    if os.path.exists(parquet_file):
+        return pd.read_parquet(parquet_file)
     return pd.read_csv(f"results/scored/{dataset}_{model}.csv")
 
 def run_tests():
@@ -27,6 +31,15 @@ def run_tests():
             df = load_scored(dataset, model)
             scores[model] = df
 
+        # pull the test inputs out as arrays once per dataset; accuracy
+        # flags are packed 64 questions per word so discordant-pair
+        # counts are a couple of bitwise ops regardless of N
+        cons = {m: scores[m]["consistency_score"].to_numpy() for m in MODELS}
+        acc_bits = np.packbits(np.stack(
+            [scores[m]["is_accurate"].to_numpy(bool) for m in MODELS]),
+            axis=1)
+        midx = {m: i for i, m in enumerate(MODELS)}
+
         print("\nConsistency Score Comparisons (Wilcoxon signed-rank test):")
         pairs = [
             ("llama3.2", "phi3_mini"),
@@ -38,9 +51,7 @@ def run_tests():
         ]
 
         for m1, m2 in pairs:
-            s1 = scores[m1]["consistency_score"].values
-            s2 = scores[m2]["consistency_score"].values
-            stat, p = stats.wilcoxon(s1, s2)
+            stat, p = stats.wilcoxon(cons[m1], cons[m2])
             sig = "***" if p < 0.001 else "**" if p < 0.01 else \
                   "*" if p < 0.05 else "ns"
             print(f"  {m1} vs {m2}: W={stat:.1f}, p={p:.4f} {sig}")
@@ -57,11 +68,12 @@ def run_tests():
 
         print("\nAccuracy Comparisons (McNemar test):")
         for m1, m2 in pairs:
-            a1 = scores[m1]["is_accurate"].astype(int).values
-            a2 = scores[m2]["is_accurate"].astype(int).values
+            b1 = acc_bits[midx[m1]]
+            b2 = acc_bits[midx[m2]]
 
-            m1_only = np.sum((a1 == 1) & (a2 == 0))
-            m2_only = np.sum((a1 == 0) & (a2 == 1))
+            # packbits pads with zeros, so the pad bits never count
+            m1_only = int(np.unpackbits(b1 & ~b2).sum())
+            m2_only = int(np.unpackbits(~b1 & b2).sum())
 
             if m1_only + m2_only > 0:
                 chi2 = (abs(m1_only - m2_only) - 1)**2 / \
@@ -10,21 +10,57 @@ Figure 4 - Roleplay gap
 Figure 5 - Unknown rate
 Figure 6 - Consistency vs Accuracy scatter
 Figure 7 - Consistency distribution box plots
+Figure 8 - Fully consistent questions
 """
 
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")   # non-interactive and safe in worker processes
+import matplotlib.patches as mpatches
 import matplotlib.pyplot as plt
+from matplotlib.font_manager import FontProperties
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import glob
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, wraps
 
 os.makedirs("figures", exist_ok=True)
 
-df = pd.read_csv("results/summary/master_summary.csv")
 
 MODELS = ["phi3_mini", "llama3.2", "gemma2", "mistral", "meditron"]
 DATASETS = ["medqa", "medmcqa", "pubmedqa"]
 STYLES = ["original", "formal", "simplified", "roleplay", "direct"]
 
+
+@lru_cache(maxsize=None)
+def get_df() -> pd.DataFrame:
+    """
+    Master summary, loaded once per process (workers re-import us).
+    model/dataset become Categoricals so comparisons and pivots run on
+    integer codes instead of object-dtype strings, and numeric columns
+    are narrowed to float32 — plenty for plotting.
+    """
+    df = pd.read_csv("results/summary/master_summary.csv")
+    df["model"] = pd.Categorical(df["model"], categories=MODELS)
+    df["dataset"] = pd.Categorical(df["dataset"], categories=DATASETS)
+    num_cols = df.select_dtypes("number").columns
+    df[num_cols] = df[num_cols].astype("float32")
+    return df
+
+
+@lru_cache(maxsize=None)
+def get_df_indexed() -> pd.DataFrame:
+    """
+    Master summary indexed and sorted by (model, dataset), so per-model
+    slices and per-cell scalars are hash/binary-search lookups
+    (df_idx.loc[m], df_idx.at[(m, d), col]) rather than the O(N)
+    boolean-mask scan that df[df.model == m] runs every call.
+    """
+    return get_df().set_index(["model", "dataset"]).sort_index()
+
 MODEL_LABELS = {
     "phi3_mini": "Phi-3 Mini\n(3.8B)",
     "llama3.2":  "Llama 3.2\n(3B)",
@@ -47,101 +83,163 @@ COLORS = {
     "meditron":  "#8172B2"
 }
 
+# prebuilt label/legend artifacts shared by every figure — cheap Patch
+# handles instead of throwaway empty scatter artists
+DATASET_TICKLABELS = [DATASET_LABELS[d] for d in DATASETS]
+MODEL_TICKLABELS = [MODEL_LABELS[m] for m in MODELS]
+MODEL_LINE_LABELS = [MODEL_LABELS[m].replace("\n", " ") for m in MODELS]
+DATASET_INLINE = {k: v.replace("\n", " ") for k, v in DATASET_LABELS.items()}
+LEGEND_HANDLES = [mpatches.Patch(color=COLORS[m], label=MODEL_LINE_LABELS[i])
+                  for i, m in enumerate(MODELS)]
+
+# one FontProperties shared by all heatmap cell annotations, so each
+# ax.text reuses the cached font face instead of resolving it again
+CELL_FONT = FontProperties(size=12, weight="bold")
+
+# PNG encode settings for every savefig: zlib level 1 instead of the
+# default 6 — the publisher re-encodes our figures anyway, so the extra
+# compression CPU buys nothing
+_PNG_KWARGS = {"compress_level": 1}
+
 plt.rcParams.update({
     "font.family": "sans-serif",
     "font.size": 11,
     "axes.titlesize": 13,
     "axes.labelsize": 12,
-    "figure.dpi": 150
+    "figure.dpi": 100   # draw at screen DPI; savefig upscales
 })
 
 
+# one Figure reused by every figure function — creating a fresh Figure
+# per plot re-initializes the Agg canvas and renderer each time, which
+# dominates the cold path for these small figures
+_FIG = plt.figure()
+
+
+def _fresh_fig(width: float, height: float):
+    """Reset the shared figure to a blank constrained-layout canvas."""
+    _FIG.clear()
+    _FIG.set_size_inches(width, height)
+    _FIG.set_layout_engine("constrained")
+    return _FIG
+
+
+def needs_rebuild(output: str,
+                  inputs=("results/summary/master_summary.csv",)):
+    """
+    Skip a figure whose PNG is already newer than all of its inputs —
+    the common case when re-running the script while iterating on one
+    figure. Input entries may be glob patterns.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if os.path.exists(output):
+                out_mtime = os.path.getmtime(output)
+                in_files = [p for pattern in inputs
+                            for p in glob.glob(pattern)]
+                if in_files and all(os.path.getmtime(p) <= out_mtime
+                                    for p in in_files):
+                    print(f"  Up to date: {output} — skipping")
+                    return
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _pivot(col: str) -> np.ndarray:
+    """
+    One summary column as a (model × dataset) matrix in MODELS/DATASETS
+    order. A single C-level pivot replaces the repeated
+    df[(df.model == m) & (df.dataset == d)] boolean-mask lookups, which
+    allocate two Series and a sub-frame per cell.
+    """
+    return (get_df().pivot(index="model", columns="dataset", values=col)
+              .reindex(index=MODELS, columns=DATASETS)
+              .to_numpy())
+
+
+def _annotate_heatmap(ax, matrix: np.ndarray, fmt: str):
+    """
+    Overlay cell values with one table artist instead of a Text artist
+    per cell — one batch of font layout work for the whole heatmap.
+    """
+    cell_text = [[fmt.format(v) for v in row] for row in matrix]
+    table = ax.table(cellText=cell_text, loc="center", cellLoc="center",
+                     edges="open", bbox=[0, 0, 1, 1])
+    table.auto_set_font_size(False)
+    for cell in table.get_celld().values():
+        cell.set_facecolor("none")
+        cell.set_text_props(fontproperties=CELL_FONT, color="black")
+
+
 # ── Figure 1: Consistency heatmap ─────────────────────────────────────────────
 
+@needs_rebuild("figures/fig1_consistency_heatmap.png")
 def fig1_consistency_heatmap():
-    matrix = []
-    for model in MODELS:
-        row = []
-        for dataset in DATASETS:
-            val = df[(df.model == model) & (df.dataset == dataset)
-                     ]["mean_consistency"].values[0]
-            row.append(val)
-        matrix.append(row)
-
-    matrix = np.array(matrix)
-    fig, ax = plt.subplots(figsize=(8, 6))
+    matrix = _pivot("mean_consistency")
+    fig = _fresh_fig(8, 6)
+    ax = fig.add_subplot(111)
     im = ax.imshow(matrix, cmap="RdYlGn", vmin=0.5, vmax=1.0)
 
     ax.set_xticks(range(len(DATASETS)))
     ax.set_yticks(range(len(MODELS)))
-    ax.set_xticklabels([DATASET_LABELS[d] for d in DATASETS])
-    ax.set_yticklabels([MODEL_LABELS[m] for m in MODELS])
+    ax.set_xticklabels(DATASET_TICKLABELS)
+    ax.set_yticklabels(MODEL_TICKLABELS)
 
-    for i in range(len(MODELS)):
-        for j in range(len(DATASETS)):
-            ax.text(j, i, f"{matrix[i,j]:.3f}",
-                    ha="center", va="center",
-                    color="black", fontsize=12, fontweight="bold")
+    _annotate_heatmap(ax, matrix, "{:.3f}")
 
-    plt.colorbar(im, ax=ax, label="Mean Consistency Score")
+    fig.colorbar(im, ax=ax, label="Mean Consistency Score")
     ax.set_title("Figure 1: Mean Consistency Scores Across Models and Datasets",
                  fontweight="bold", pad=15)
-    plt.tight_layout()
-    plt.savefig("figures/fig1_consistency_heatmap.png", bbox_inches="tight")
-    plt.close()
+    fig.savefig("figures/fig1_consistency_heatmap.png", dpi=200,
+                bbox_inches="tight", pil_kwargs=_PNG_KWARGS)
+    fig.clear()
     print("  Saved fig1_consistency_heatmap.png")
 
 
 # ── Figure 2: Accuracy heatmap ────────────────────────────────────────────────
 
+@needs_rebuild("figures/fig2_accuracy_heatmap.png")
 def fig2_accuracy_heatmap():
-    matrix = []
-    for model in MODELS:
-        row = []
-        for dataset in DATASETS:
-            val = df[(df.model == model) & (df.dataset == dataset)
-                     ]["overall_accuracy"].values[0]
-            row.append(val)
-        matrix.append(row)
-
-    matrix = np.array(matrix)
-    fig, ax = plt.subplots(figsize=(8, 6))
+    matrix = _pivot("overall_accuracy")
+    fig = _fresh_fig(8, 6)
+    ax = fig.add_subplot(111)
     im = ax.imshow(matrix, cmap="RdYlGn", vmin=20, vmax=70)
 
     ax.set_xticks(range(len(DATASETS)))
     ax.set_yticks(range(len(MODELS)))
-    ax.set_xticklabels([DATASET_LABELS[d] for d in DATASETS])
-    ax.set_yticklabels([MODEL_LABELS[m] for m in MODELS])
+    ax.set_xticklabels(DATASET_TICKLABELS)
+    ax.set_yticklabels(MODEL_TICKLABELS)
 
-    for i in range(len(MODELS)):
-        for j in range(len(DATASETS)):
-            ax.text(j, i, f"{matrix[i,j]:.1f}%",
-                    ha="center", va="center",
-                    color="black", fontsize=12, fontweight="bold")
+    _annotate_heatmap(ax, matrix, "{:.1f}%")
 
-    plt.colorbar(im, ax=ax, label="Overall Accuracy (%)")
+    fig.colorbar(im, ax=ax, label="Overall Accuracy (%)")
     ax.set_title("Figure 2: Overall Accuracy Across Models and Datasets",
                  fontweight="bold", pad=15)
-    plt.tight_layout()
-    plt.savefig("figures/fig2_accuracy_heatmap.png", bbox_inches="tight")
-    plt.close()
+    fig.savefig("figures/fig2_accuracy_heatmap.png", dpi=200,
+                bbox_inches="tight", pil_kwargs=_PNG_KWARGS)
+    fig.clear()
     print("  Saved fig2_accuracy_heatmap.png")
 
 
 # ── Figure 3: Accuracy by prompt style ───────────────────────────────────────
 
+@needs_rebuild("figures/fig3_accuracy_by_style.png")
 def fig3_accuracy_by_style():
-    fig, axes = plt.subplots(1, 3, figsize=(15, 5), sharey=False)
+    # (model × dataset × style) accuracy panel — one pivot per style
+    # instead of a scalar DataFrame lookup per bar
+    acc_panel = np.stack([_pivot(f"acc_{s}") for s in STYLES], axis=-1)
+    fig = _fresh_fig(15, 5)
+    axes = fig.subplots(1, 3, sharey=False)
 
-    for ax, dataset in zip(axes, DATASETS):
+    for d_idx, (ax, dataset) in enumerate(zip(axes, DATASETS)):
         x = np.arange(len(STYLES))
         width = 0.15
 
         for i, model in enumerate(MODELS):
-            mdf = df[(df.model == model) & (df.dataset == dataset)]
-            vals = [mdf[f"acc_{s}"].values[0] for s in STYLES]
-            ax.bar(x + i * width, vals, width,
-                   label=MODEL_LABELS[model].replace("\n", " "),
+            ax.bar(x + i * width, acc_panel[i, d_idx], width,
+                   label=MODEL_LINE_LABELS[i],
                    color=COLORS[model], alpha=0.85)
 
         ax.set_title(DATASET_LABELS[dataset], fontweight="bold")
@@ -155,36 +253,43 @@ def fig3_accuracy_by_style():
 
     fig.suptitle("Figure 3: Accuracy by Prompt Style Across Models and Datasets",
                  fontweight="bold", fontsize=13)
-    plt.tight_layout()
-    plt.savefig("figures/fig3_accuracy_by_style.png", bbox_inches="tight")
-    plt.close()
+    fig.savefig("figures/fig3_accuracy_by_style.png", dpi=200, bbox_inches="tight",
+                pil_kwargs=_PNG_KWARGS)
+    fig.clear()
     print("  Saved fig3_accuracy_by_style.png")
 
 
 # ── Figure 4: Roleplay vs best style gap ─────────────────────────────────────
 
-def fig4_roleplay_gap():
-    fig, axes = plt.subplots(1, 3, figsize=(15, 5), sharey=False)
+def compute_roleplay_gap(acc_matrix: np.ndarray,
+                         rp_matrix: np.ndarray) -> np.ndarray:
+    """
+    Accuracy gap between the best non-roleplay style and roleplay, per
+    (model × dataset) cell. Pure ufunc reductions over pre-pivoted
+    arrays, so it stays fast if the model/style grid is ever scaled up.
+    """
+    return acc_matrix.max(axis=-1) - rp_matrix
 
-    for ax, dataset in zip(axes, DATASETS):
-        models_list = []
-        roleplay_acc = []
-        best_acc = []
-        gaps = []
-
-        for model in MODELS:
-            mdf = df[(df.model == model) & (df.dataset == dataset)]
-            rp = mdf["acc_roleplay"].values[0]
-            best = max(
-                mdf["acc_original"].values[0],
-                mdf["acc_formal"].values[0],
-                mdf["acc_simplified"].values[0],
-                mdf["acc_direct"].values[0]
-            )
-            models_list.append(MODEL_LABELS[model].replace("\n", " "))
-            roleplay_acc.append(rp)
-            best_acc.append(best)
-            gaps.append(best - rp)
+
+@needs_rebuild("figures/fig4_roleplay_gap.png")
+def fig4_roleplay_gap():
+    # best non-roleplay accuracy per (model × dataset): stack the four
+    # pivoted style matrices and reduce with one np.max
+    non_rp = np.stack(
+        [_pivot(f"acc_{s}")
+         for s in ("original", "formal", "simplified", "direct")],
+        axis=-1)
+    best = non_rp.max(axis=-1)
+    roleplay = _pivot("acc_roleplay")
+    all_gaps = compute_roleplay_gap(non_rp, roleplay)
+
+    fig = _fresh_fig(15, 5)
+    axes = fig.subplots(1, 3, sharey=False)
+
+    for d_idx, (ax, dataset) in enumerate(zip(axes, DATASETS)):
+        best_acc = best[:, d_idx]
+        roleplay_acc = roleplay[:, d_idx]
+        gaps = all_gaps[:, d_idx]
 
         x = np.arange(len(MODELS))
         width = 0.35
@@ -206,7 +311,7 @@ def fig4_roleplay_gap():
 
         ax.set_title(DATASET_LABELS[dataset], fontweight="bold")
         ax.set_xticks(x)
-        ax.set_xticklabels(models_list, rotation=15, ha="right")
+        ax.set_xticklabels(MODEL_LINE_LABELS, rotation=15, ha="right")
         ax.set_ylabel("Accuracy (%)")
         ax.set_ylim(0, 80)
         ax.legend(fontsize=8)
@@ -215,72 +320,89 @@ def fig4_roleplay_gap():
     fig.suptitle(
         "Figure 4: Roleplay Prompt Accuracy vs Best Performing Style",
         fontweight="bold", fontsize=13)
-    plt.tight_layout()
-    plt.savefig("figures/fig4_roleplay_gap.png", bbox_inches="tight")
-    plt.close()
+    fig.savefig("figures/fig4_roleplay_gap.png", dpi=200, bbox_inches="tight",
+                pil_kwargs=_PNG_KWARGS)
+    fig.clear()
     print("  Saved fig4_roleplay_gap.png")
 
 
-# ── Figure 5: Unknown rate ────────────────────────────────────────────────────
+# ── Figures 5/8: grouped bars per model over datasets ─────────────────────────
 
-def fig5_unknown_rate():
-    fig, ax = plt.subplots(figsize=(10, 5))
+def _grouped_bar(col: str, ylabel: str, title: str, outpath: str):
+    """
+    One summary column as grouped bars (models over datasets). The
+    per-model grouped-bar figures share this code path and one pivot.
+    """
+    fig = _fresh_fig(10, 5)
+    ax = fig.add_subplot(111)
     x = np.arange(len(DATASETS))
     width = 0.15
 
+    piv = _pivot(col)
     for i, model in enumerate(MODELS):
-        vals = []
-        for dataset in DATASETS:
-            val = df[(df.model == model) & (df.dataset == dataset)
-                     ]["unknown_rate"].values[0]
-            vals.append(val)
-        ax.bar(x + i * width, vals, width,
-               label=MODEL_LABELS[model].replace("\n", " "),
+        ax.bar(x + i * width, piv[i], width,
+               label=MODEL_LINE_LABELS[i],
                color=COLORS[model], alpha=0.85)
 
     ax.set_xticks(x + width * 2)
-    ax.set_xticklabels([DATASET_LABELS[d] for d in DATASETS])
-    ax.set_ylabel("Unknown Rate (%)")
-    ax.set_title("Figure 5: Instruction-Following Failure Rate (Unknown Responses)",
-                 fontweight="bold")
+    ax.set_xticklabels(DATASET_TICKLABELS)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title, fontweight="bold")
     ax.legend(fontsize=9)
     ax.grid(True, alpha=0.3, axis="y")
-    plt.tight_layout()
-    plt.savefig("figures/fig5_unknown_rate.png", bbox_inches="tight")
-    plt.close()
-    print("  Saved fig5_unknown_rate.png")
+    fig.savefig(outpath, dpi=200, pil_kwargs=_PNG_KWARGS)
+    fig.clear()
+    print(f"  Saved {os.path.basename(outpath)}")
+
+
+@needs_rebuild("figures/fig5_unknown_rate.png")
+def fig5_unknown_rate():
+    _grouped_bar(
+        "unknown_rate", "Unknown Rate (%)",
+        "Figure 5: Instruction-Following Failure Rate (Unknown Responses)",
+        "figures/fig5_unknown_rate.png")
+
+
+@needs_rebuild("figures/fig8_fully_consistent.png")
+def fig8_fully_consistent():
+    _grouped_bar(
+        "fully_consistent_pct", "Fully Consistent Questions (%)",
+        "Figure 8: Questions Answered Identically Across All 5 Prompt Styles",
+        "figures/fig8_fully_consistent.png")
 
 
 # ── Figure 6: Consistency vs Accuracy scatter ─────────────────────────────────
 
+@needs_rebuild("figures/fig6_consistency_vs_accuracy.png")
 def fig6_consistency_vs_accuracy():
-    fig, (ax_main, ax_inset) = plt.subplots(1, 2,
-        figsize=(16, 7),
-        gridspec_kw={'width_ratios': [3, 1]})
+    df_idx = get_df_indexed()
+    fig = _fresh_fig(16, 7)
+    ax_main, ax_inset = fig.subplots(
+        1, 2, gridspec_kw={'width_ratios': [3, 1]})
 
     for model in MODELS:
-        mdf = df[df.model == model]
-
-        for _, row in mdf.iterrows():
-            if model == "meditron" and row["dataset"] == "pubmedqa":
-                continue
-            ax_main.scatter(row["mean_consistency"],
-                          row["overall_accuracy"],
-                          color=COLORS[model], s=150, zorder=5)
+        # indexed slice — no boolean scan over the whole frame per model
+        mdf = df_idx.loc[model]
+        xs = mdf["mean_consistency"].to_numpy()
+        ys = mdf["overall_accuracy"].to_numpy()
+        ds = mdf.index.to_numpy()
+
+        # one scatter call per model instead of one per row
+        keep = (ds != "pubmedqa") if model == "meditron" \
+            else np.ones(len(ds), dtype=bool)
+        ax_main.scatter(xs[keep], ys[keep],
+                        color=COLORS[model], s=150, zorder=5)
+        for x, y, d in zip(xs[keep], ys[keep], ds[keep]):
             ax_main.annotate(
-                DATASET_LABELS[row["dataset"]].replace("\n", " "),
-                (row["mean_consistency"], row["overall_accuracy"]),
+                DATASET_INLINE[d], (x, y),
                 textcoords="offset points", xytext=(8, 5),
                 fontsize=8, color=COLORS[model])
 
         if model == "meditron":
-            for _, row in mdf.iterrows():
-                ax_inset.scatter(row["mean_consistency"],
-                               row["overall_accuracy"],
-                               color=COLORS[model], s=150, zorder=5)
+            ax_inset.scatter(xs, ys, color=COLORS[model], s=150, zorder=5)
+            for x, y, d in zip(xs, ys, ds):
                 ax_inset.annotate(
-                    DATASET_LABELS[row["dataset"]].replace("\n", " "),
-                    (row["mean_consistency"], row["overall_accuracy"]),
+                    DATASET_INLINE[d], (x, y),
                     textcoords="offset points", xytext=(5, 5),
                     fontsize=8, color=COLORS[model])
 
@@ -292,10 +414,7 @@ def fig6_consistency_vs_accuracy():
     ax_main.set_ylim(25, 70)
     ax_main.grid(True, alpha=0.3)
 
-    handles = [plt.scatter([], [], color=COLORS[m], s=100,
-               label=MODEL_LABELS[m].replace("\n", " "))
-               for m in MODELS]
-    ax_main.legend(handles=handles, loc="upper left", fontsize=9)
+    ax_main.legend(handles=LEGEND_HANDLES, loc="upper left", fontsize=9)
 
     ax_inset.set_xlabel("Mean Consistency Score", fontsize=10)
     ax_inset.set_ylabel("Overall Accuracy (%)", fontsize=10)
@@ -312,26 +431,40 @@ def fig6_consistency_vs_accuracy():
 
     fig.suptitle("Figure 6: Consistency vs Accuracy — Are They Correlated?",
                  fontweight="bold", fontsize=13)
-    plt.tight_layout()
-    plt.savefig("figures/fig6_consistency_vs_accuracy.png", bbox_inches="tight")
-    plt.close()
+    fig.savefig("figures/fig6_consistency_vs_accuracy.png", dpi=200, bbox_inches="tight",
+                pil_kwargs=_PNG_KWARGS)
+    fig.clear()
     print("  Saved fig6_consistency_vs_accuracy.png")
 
 
 # ── Figure 7: Consistency distribution box plots ─────────────────────────────
 
+@lru_cache(maxsize=None)
+def _load_scores(dataset: str, model: str) -> np.ndarray:
+    """
+    Per-question consistency scores for one scored file, read with
+    pyarrow's CSV reader projected onto the single column we plot — no
+    pandas object construction at all. Repeat calls (e.g. in a
+    notebook session) hit the cache instead of re-reading the file.
+    """
+    tbl = pacsv.read_csv(
+        f"results/scored/{dataset}_{model}.csv",
+        convert_options=pacsv.ConvertOptions(
+            include_columns=["consistency_score"],
+            column_types={"consistency_score": pa.float32()}))
+    return tbl.column("consistency_score").to_numpy(zero_copy_only=False)
+
+
+@needs_rebuild("figures/fig7_consistency_distribution.png",
+               inputs=("results/summary/master_summary.csv",
+                       "results/scored/*.csv"))
 def fig7_consistency_distribution():
-    fig, axes = plt.subplots(1, 3, figsize=(15, 5), sharey=True)
+    fig = _fresh_fig(15, 5)
+    axes = fig.subplots(1, 3, sharey=True)
 
     for ax, dataset in zip(axes, DATASETS):
-        data_to_plot = []
-        labels = []
-
-        for model in MODELS:
-            scored_file = f"results/scored/{dataset}_{model}.csv"
-            sdf = pd.read_csv(scored_file)
-            data_to_plot.append(sdf["consistency_score"].values)
-            labels.append(MODEL_LABELS[model].replace("\n", " "))
+        data_to_plot = [_load_scores(dataset, model) for model in MODELS]
+        labels = MODEL_LINE_LABELS
 
         bp = ax.boxplot(data_to_plot, labels=labels, patch_artist=True,
                         medianprops=dict(color="black", linewidth=2))
@@ -349,21 +482,32 @@ def fig7_consistency_distribution():
     fig.suptitle(
         "Figure 7: Distribution of Consistency Scores Across Models and Datasets",
         fontweight="bold", fontsize=13)
-    plt.tight_layout()
-    plt.savefig("figures/fig7_consistency_distribution.png", bbox_inches="tight")
-    plt.close()
+    fig.savefig("figures/fig7_consistency_distribution.png", dpi=200, bbox_inches="tight",
+                pil_kwargs=_PNG_KWARGS)
+    fig.clear()
     print("  Saved fig7_consistency_distribution.png")
 
 
 # ── Run all figures ───────────────────────────────────────────────────────────
 
+FIGURES = [
+    fig1_consistency_heatmap,
+    fig2_accuracy_heatmap,
+    fig3_accuracy_by_style,
+    fig4_roleplay_gap,
+    fig5_unknown_rate,
+    fig6_consistency_vs_accuracy,
+    fig7_consistency_distribution,
+    fig8_fully_consistent,
+]
+
+
 if __name__ == "__main__":
     print("Generating figures...")
-    fig1_consistency_heatmap()
-    fig2_accuracy_heatmap()
-    fig3_accuracy_by_style()
-    fig4_roleplay_gap()
-    fig5_unknown_rate()
-    fig6_consistency_vs_accuracy()
-    fig7_consistency_distribution()
-    print("\n✅ All 7 figures saved to figures/")
\ No newline at end of file
+    # figures are independent and rasterization-bound — render them in
+    # parallel worker processes (each re-imports this module with Agg)
+    with ProcessPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(fig) for fig in FIGURES]
+        for future in futures:
+            future.result()
+    print(f"\n✅ All {len(FIGURES)} figures saved to figures/")
\ No newline at end of file